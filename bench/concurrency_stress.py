@@ -0,0 +1,179 @@
+"""Check that concurrent writes for one user serialize and writes for different users don't contend.
+
+    python -m bench.concurrency_stress [--threads 8] [--rounds 25]
+
+Seeds a synthetic ledger into DATABASE_URL (a throwaway SQLite file unless
+set; point it at a scratch MySQL schema for real row-level concurrency),
+then runs two phases with one test client per thread:
+
+- same user: each round every thread initiates a transaction for one
+  customer at once, then every thread verifies the round's winner at once.
+  Exactly one initiate may succeed per round, the amount must be counted
+  once, and the ledger head must match a rebuild from the history.
+- same user, bulk: the same race through `/initiatetransactions/bulk`,
+  each thread posting a one-item batch.
+- different users: each thread initiates and verifies for a customer of
+  its own. No write may have to be replayed.
+
+Exits non-zero if either phase finds a problem.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('METRICS_ENABLED', '1')  # Replayed writes are counted in request_metrics
+
+from bench.seed import app, db, Transaction, LedgerHead, compute_ledger_heads, seed_ledger, auth_header  # noqa: E402
+from app import request_metrics  # noqa: E402
+
+
+def replayed_writes():
+    return sum(request_metrics.conflicts._values.values())
+
+
+def run_threads(threads, worker):
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def initiate(client, manager, transaction_id, username, bulk):
+    """Initiate one transaction, alone or as a one-item bulk batch; return (status code, body)."""
+    item = {'transaction_id': transaction_id, 'payment_method': 'cash', 'amount': 10, 'initiated_for': username}
+    if not bulk:
+        response = client.post('/initiatetransaction', headers=manager, json=item)
+        return response.status_code, response.get_json()
+    response = client.post('/initiatetransactions/bulk', headers=manager, json=[item])
+    if response.status_code not in [201, 207]:
+        return response.status_code, response.get_json()
+    result = response.get_json()['results'][0]
+    return result['status'], result
+
+
+def same_user(username, threads, rounds, manager, admin, bulk=False):
+    barrier = threading.Barrier(threads)
+    winners = [[] for _ in range(rounds)]
+    problems = []
+
+    def worker(n):
+        client = app.test_client()
+        for r in range(rounds):
+            barrier.wait()
+            transaction_id = f'{"bulk" if bulk else "race"}-{r}-{n}'
+            status, body = initiate(client, manager, transaction_id, username, bulk)
+            if status == 201:
+                winners[r].append(transaction_id)
+            elif status not in [400, 409]:
+                problems.append(f'initiate {transaction_id}: {status} {body}')
+            barrier.wait()
+            if winners[r]:
+                response = client.post('/modifytransaction', headers=admin, json={
+                    'transaction_id': winners[r][0], 'status': 'VERIFIED'})
+                if response.status_code not in [200, 409]:
+                    problems.append(f'verify {winners[r][0]}: {response.status_code} {response.get_json()}')
+
+    with app.app_context():
+        before = db.session.get(LedgerHead, username).total_amount
+    elapsed = run_threads(threads, worker)
+
+    for r, round_winners in enumerate(winners):
+        if len(round_winners) != 1:
+            problems.append(f'round {r}: {len(round_winners)} initiates succeeded')
+    with app.app_context():
+        head = db.session.get(LedgerHead, username)
+        computed = compute_ledger_heads([username])[username]
+        if abs(head.total_amount - computed['total_amount']) > 1e-6 \
+                or head.head_transaction_id != computed['head_transaction_id']:
+            problems.append(f'head {head.total_amount}/{head.head_transaction_id} '
+                            f'but history says {computed["total_amount"]}/{computed["head_transaction_id"]}')
+        expected = before - 10 * sum(len(round_winners) for round_winners in winners)
+        if abs(head.total_amount - expected) > 1e-6:
+            problems.append(f'balance {head.total_amount}, expected {expected}')
+        pending = db.session.execute(db.select(db.func.count()).where(
+            Transaction.initiated_for == username, Transaction.record_status == 1,
+            Transaction.status != 'VERIFIED')).scalar()
+        if pending > 1:
+            problems.append(f'{pending} pending transactions')
+    return elapsed, problems
+
+
+def different_users(usernames, rounds, manager, admin):
+    problems = []
+
+    def worker(n):
+        client = app.test_client()
+        for r in range(rounds):
+            transaction_id = f'own-{r}-{n}'
+            response = client.post('/initiatetransaction', headers=manager, json={
+                'transaction_id': transaction_id, 'payment_method': 'cash', 'amount': 10,
+                'initiated_for': usernames[n]})
+            if response.status_code != 201:
+                problems.append(f'initiate {transaction_id}: {response.status_code} {response.get_json()}')
+                continue
+            response = client.post('/modifytransaction', headers=admin, json={
+                'transaction_id': transaction_id, 'status': 'VERIFIED'})
+            if response.status_code != 200:
+                problems.append(f'verify {transaction_id}: {response.status_code} {response.get_json()}')
+
+    elapsed = run_threads(len(usernames), worker)
+    return elapsed, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=25)
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed_ledger(customers=max(50, 3 * args.threads), rows=args.rows)
+        admin = auth_header('admin', 'A')
+        manager = auth_header('manager', 'M')
+        settled = db.session.execute(
+            db.select(LedgerHead.username)
+            .join(Transaction, Transaction.transaction_id == LedgerHead.head_transaction_id)
+            .where(db.or_(Transaction.status == 'VERIFIED', Transaction.record_status == 0))
+            .order_by(LedgerHead.username)).scalars().all()
+    if len(settled) <= args.threads + 1:
+        sys.exit(f'Only {len(settled)} settled customers, need {args.threads + 2}')
+
+    failed = False
+    replayed = replayed_writes()
+    elapsed, problems = same_user(settled[0], args.threads, args.rounds, manager, admin)
+    print(f'same user:       {args.rounds} rounds x {args.threads} threads in {elapsed:.2f}s, '
+          f'{replayed_writes() - replayed} writes replayed')
+    for problem in problems:
+        print(f'  FAIL {problem}')
+    failed |= bool(problems)
+
+    replayed = replayed_writes()
+    elapsed, problems = same_user(settled[-1], args.threads, args.rounds, manager, admin, bulk=True)
+    print(f'same user, bulk: {args.rounds} rounds x {args.threads} threads in {elapsed:.2f}s, '
+          f'{replayed_writes() - replayed} writes replayed')
+    for problem in problems:
+        print(f'  FAIL {problem}')
+    failed |= bool(problems)
+
+    replayed = replayed_writes()
+    elapsed, problems = different_users(settled[1:args.threads + 1], args.rounds, manager, admin)
+    replayed = replayed_writes() - replayed
+    writes = 2 * args.rounds * args.threads
+    print(f'different users: {writes} writes in {elapsed:.2f}s ({writes / elapsed:.0f}/s), {replayed} writes replayed')
+    if replayed:
+        problems.append(f'{replayed} writes replayed although no two threads share a user')
+    for problem in problems:
+        print(f'  FAIL {problem}')
+    failed |= bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
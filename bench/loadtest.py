@@ -0,0 +1,244 @@
+"""Mixed-traffic load test across the app's eleven original routes.
+
+    python -m bench.loadtest [--users 8] [--seconds 10] [--url http://127.0.0.1:8000]
+
+Seeds users, orders and transactions into DATABASE_URL (a throwaway SQLite
+file unless set; point it at a local MySQL schema for realistic numbers),
+then runs `--users` virtual users for `--seconds`. Each picks its next
+request from a weighted mix of reads, logins and ledger writes on a set of
+customers of its own, so writes stay valid without coordinating. Requests
+go through the Flask test client in this process, or with `--url` to a
+running server (e.g. gunicorn with gunicorn.conf.py) sharing the same
+database. Prints per-route throughput and p50/p99 latency, and counts any
+unexpected status codes.
+"""
+import argparse
+import http.cookiejar
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from bench.seed import app, db, Transaction, LedgerHead, seed_ledger, auth_header
+
+# Relative weight of each route in the traffic mix
+ROUTE_WEIGHTS = {
+    'GET /gettransactions': 20,
+    'GET /getorders': 20,
+    'GET /username': 5,
+    'POST /login': 4,
+    'GET /logout': 2,
+    'POST /initiatetransaction': 8,
+    'POST /initiateorder': 8,
+    'POST /modifytransaction': 14,
+    'POST /modifyorder': 8,
+    'POST /modifytransaction_delete': 2,
+    'POST /modifyorder_delete': 2,
+}
+# Login answers 503 when its hash pool is saturated, by design
+EXPECTED_STATUSES = {'POST /login': {200, 503}}
+
+
+class InProcessClient:
+    def __init__(self):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers=None, body=None):
+        response = self.client.open(path, method=method, headers=headers, json=body)
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """Plain urllib client with its own cookie jar (for `/login`'s session cookie)."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, headers=None, body=None):
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        try:
+            with self.opener.open(urllib.request.Request(self.base_url + path, data, headers, method=method)) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+class VirtualUser:
+    """One simulated client working on its own customers' ledgers."""
+
+    def __init__(self, n, client, customers, pending, headers, rng):
+        self.n = n
+        self.client = client
+        self.customers = customers
+        self.pending = {username: pending.get(username) for username in customers}
+        self.heads = dict(self.pending)
+        self.orders = []
+        self.headers = headers
+        self.rng = rng
+        self.counter = 0
+        self.logged_in = False
+        self.samples = []
+
+    def next_id(self):
+        self.counter += 1
+        return f'lt{self.n:03d}-{self.counter:07d}'
+
+    def call(self, route, path, role='admin', body=None):
+        method = route.split()[0]
+        started = time.perf_counter()
+        status = self.client.request(method, path, self.headers[role], body)
+        self.samples.append((route, status, time.perf_counter() - started))
+        return status
+
+    def run(self, deadline):
+        routes, weights = list(ROUTE_WEIGHTS), list(ROUTE_WEIGHTS.values())
+        while time.perf_counter() < deadline:
+            getattr(self, self.rng.choices(routes, weights)[0].split()[1].strip('/'))()
+
+    def gettransactions(self):
+        if self.rng.random() < 0.5:
+            self.call('GET /gettransactions', '/gettransactions?limit=50', role='manager')
+        else:
+            self.call('GET /gettransactions', '/gettransactions', role='customer')
+
+    def getorders(self):
+        if self.rng.random() < 0.5:
+            self.call('GET /getorders', '/getorders?limit=50', role='manager')
+        else:
+            self.call('GET /getorders', '/getorders', role='customer')
+
+    def username(self):
+        self.call('GET /username', '/username', role='customer')
+
+    def login(self):
+        status = self.call('POST /login', '/login', body={'username': self.rng.choice(self.customers),
+                                                         'password': 'password'})
+        self.logged_in = status == 200
+
+    def logout(self):
+        if not self.logged_in:
+            return self.login()
+        self.call('GET /logout', '/logout')
+        self.logged_in = False
+
+    def initiate(self, route):
+        settled = [username for username in self.customers if not self.pending[username]]
+        if not settled:
+            return self.modifytransaction()
+        username = self.rng.choice(settled)
+        transaction_id = self.next_id()
+        body = {'transaction_id': transaction_id, 'payment_method': 'cash', 'initiated_for': username,
+                'comments': 'loadtest'}
+        if route == 'POST /initiateorder':
+            body.update(no_bags=self.rng.randint(1, 400), rate=325.5)
+        else:
+            body.update(amount=self.rng.randint(100, 50000))
+        if self.call(route, route.split()[1], role='manager', body=body) == 201:
+            self.pending[username] = self.heads[username] = transaction_id
+            if route == 'POST /initiateorder':
+                self.orders.append(transaction_id)
+
+    def initiatetransaction(self):
+        self.initiate('POST /initiatetransaction')
+
+    def initiateorder(self):
+        self.initiate('POST /initiateorder')
+
+    def modifytransaction(self):
+        pending = [username for username in self.customers if self.pending[username]]
+        if not pending:
+            return self.initiatetransaction()
+        username = self.rng.choice(pending)
+        if self.call('POST /modifytransaction', '/modifytransaction',
+                     body={'transaction_id': self.pending[username], 'status': 'VERIFIED'}) == 200:
+            self.pending[username] = None
+
+    def modifyorder(self):
+        if not self.orders:
+            return self.initiateorder()
+        self.call('POST /modifyorder', '/modifyorder', body={'order_id': self.rng.choice(self.orders), 'status': 'VERIFIED'})
+
+    def modifytransaction_delete(self):
+        known = [username for username in self.customers if self.heads[username]]
+        if not known:
+            return self.initiatetransaction()
+        username = self.rng.choice(known)
+        if self.call('POST /modifytransaction_delete', '/modifytransaction_delete',
+                     body={'transaction_id': self.heads[username]}) == 200:
+            self.pending[username] = None
+
+    def modifyorder_delete(self):
+        if not self.orders:
+            return self.initiateorder()
+        order_id = self.orders.pop(self.rng.randrange(len(self.orders)))
+        self.call('POST /modifyorder_delete', '/modifyorder_delete', body={'order_id': order_id})
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=8, help='Concurrent virtual users.')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--url', help='Base URL of a running server; in-process test client if omitted.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with app.app_context():
+        customers = seed_ledger(args.customers, args.rows, args.seed)
+        pending = dict(db.session.execute(
+            db.select(LedgerHead.username, LedgerHead.head_transaction_id)
+            .join(Transaction, Transaction.transaction_id == LedgerHead.head_transaction_id)
+            .where(Transaction.status != 'VERIFIED', Transaction.record_status == 1)).all())
+        headers = [{'admin': auth_header('admin', 'A'), 'manager': auth_header('manager', 'M'),
+                    'customer': auth_header(customers[n % len(customers)], 'U')} for n in range(args.users)]
+
+    virtual_users = [VirtualUser(n, HttpClient(args.url) if args.url else InProcessClient(),
+                                 customers[n::args.users], pending, headers[n], random.Random(args.seed + n))
+                     for n in range(args.users)]
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=user.run, args=(deadline,)) for user in virtual_users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies, unexpected = defaultdict(list), defaultdict(lambda: defaultdict(int))
+    for user in virtual_users:
+        for route, status, seconds in user.samples:
+            latencies[route].append(seconds)
+            if status not in EXPECTED_STATUSES.get(route, {200, 201}):
+                unexpected[route][status] += 1
+
+    print(f'{args.users} users for {elapsed:.1f}s against {args.url or "the in-process test client"}')
+    print(f'{"route":<32} {"requests":>9} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8}  unexpected')
+    for route in ROUTE_WEIGHTS:
+        samples = latencies.get(route, [])
+        statuses = ', '.join(f'{status}x{count}' for status, count in sorted(unexpected[route].items()))
+        print(f'{route:<32} {len(samples):>9} {len(samples) / elapsed:>8.1f} {percentile(samples, 0.5) * 1000:>8.1f} '
+              f'{percentile(samples, 0.99) * 1000:>8.1f}  {statuses}')
+    everything = [seconds for samples in latencies.values() for seconds in samples]
+    print(f'{"total":<32} {len(everything):>9} {len(everything) / elapsed:>8.1f} '
+          f'{percentile(everything, 0.5) * 1000:>8.1f} {percentile(everything, 0.99) * 1000:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Read latency with and without a concurrent login storm.
+
+    python -m bench.login_load [--readers 4] [--logins 8] [--seconds 5]
+
+Seeds a synthetic ledger into DATABASE_URL (a throwaway SQLite file unless
+set) and runs two phases of the same length: reader threads alone paging
+`/getorders` and `/gettransactions`, then the same readers while login
+threads hammer `/login`. Password hashes run on the bounded pool sized by
+PASSWORD_HASH_WORKERS/PASSWORD_HASH_QUEUE, so the readers' p99 should
+barely move and excess logins should get a fast 503.
+"""
+import argparse
+import threading
+import time
+
+from bench.seed import app, seed_ledger, auth_header
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0
+
+
+def run_phase(seconds, readers, logins, read_headers, usernames):
+    deadline = time.perf_counter() + seconds
+    read_times, login_times, login_codes = [], [], []
+
+    def reader(n):
+        client = app.test_client()
+        paths = ['/getorders?limit=50', '/gettransactions?limit=50']
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get(paths[len(read_times) % 2], headers=read_headers[n % len(read_headers)])
+            read_times.append(time.perf_counter() - started)
+
+    def login(n):
+        client = app.test_client()
+        i = n
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = client.post('/login', json={'username': usernames[i % len(usernames)], 'password': 'password'})
+            login_times.append(time.perf_counter() - started)
+            login_codes.append(response.status_code)
+            i += logins
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=login, args=(n,)) for n in range(logins)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return read_times, login_times, login_codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--logins', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        usernames = seed_ledger(rows=args.rows)
+        read_headers = [auth_header('manager', 'M')] + [auth_header(username, 'U') for username in usernames[:3]]
+
+    for name, logins in [('reads only', 0), (f'reads + {args.logins} login threads', args.logins)]:
+        read_times, login_times, login_codes = run_phase(args.seconds, args.readers, logins, read_headers, usernames)
+        print(f'{name}:')
+        print(f'  reads   {len(read_times) / args.seconds:8.1f}/s  p50 {percentile(read_times, 0.5) * 1000:7.1f} ms  '
+              f'p99 {percentile(read_times, 0.99) * 1000:7.1f} ms')
+        if login_times:
+            accepted = sum(code == 200 for code in login_codes)
+            print(f'  logins  {len(login_times) / args.seconds:8.1f}/s  p50 {percentile(login_times, 0.5) * 1000:7.1f} ms  '
+                  f'p99 {percentile(login_times, 0.99) * 1000:7.1f} ms  '
+                  f'({accepted} accepted, {login_codes.count(503)} turned away with 503)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Rows/sec of the list-route read path: ORM hydration versus column projection.
+
+    python -m bench.projection [--rows 100000]
+
+"before" is the original read path (full `Transaction` objects with
+joinedloaded `initiated_by`/`verified_by` plus a user map); "after" is the
+projection `/gettransactions` uses now. Both build the response structure
+but stop short of JSON encoding.
+"""
+import argparse
+import time
+
+from bench.seed import app, db, User, Transaction, seed_ledger
+from app import TRANSACTION_COLUMNS, serialize_transaction
+from sqlalchemy.orm import joinedload
+
+
+def orm_read():
+    transactions = Transaction.query.filter_by(record_status=1) \
+        .options(joinedload(Transaction.initiated_by), joinedload(Transaction.verified_by)) \
+        .order_by(Transaction.initiated_date.desc()).all()
+    users = {user.username: user for user in User.query.all()}
+    result = []
+    for t in transactions:
+        initiated_by_user = users.get(t.initiated_by_id)
+        verified_by_user = users.get(t.verified_by_id)
+        initiated_for_user = users.get(t.initiated_for)
+        result.append({
+            'transaction_id': t.transaction_id,
+            'payment_method': t.payment_method,
+            'amount': t.amount,
+            'status': t.status,
+            'initiated_date': t.initiated_date,
+            'verified_date': t.verified_date if t.verified_date else "NA",
+            'initiated_by': initiated_by_user.username if initiated_by_user else "NA",
+            'verified_by': verified_by_user.username if verified_by_user else "NA",
+            'initiated_for': initiated_for_user.username if initiated_for_user else "NA",
+            'total_amount': t.total_amount,
+            'comments': t.comments
+        })
+    return result
+
+
+def projection_read():
+    query = db.select(*TRANSACTION_COLUMNS).where(Transaction.record_status == 1) \
+        .order_by(Transaction.initiated_date.desc(), Transaction.transaction_id.desc())
+    return [serialize_transaction(row) for row in db.session.execute(query)]
+
+
+def best_rate(read, repeat):
+    best = 0
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        count = len(read())
+        best = max(best, count / (time.perf_counter() - started))
+    return count, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed_ledger(rows=args.rows)
+        count, before = best_rate(orm_read, args.repeat)
+        _, after = best_rate(projection_read, args.repeat)
+    print(f'{count} active rows, best of {args.repeat}')
+    print(f'before (ORM + joinedload): {before:12,.0f} rows/s')
+    print(f'after  (projection):       {after:12,.0f} rows/s  ({after / before:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
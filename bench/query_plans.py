@@ -0,0 +1,117 @@
+"""Check that every route's queries on the ledger tables are served by an index.
+
+    python -m bench.query_plans [--rows 200000]
+
+Seeds a synthetic ledger into DATABASE_URL (a throwaway SQLite file unless
+set; point it at a scratch MySQL schema to check MySQL plans), drives each
+route once, EXPLAINs every SELECT it issued and exits non-zero if one of
+them full-scans or filesorts `transaction`, `orders` or their archives.
+"""
+import argparse
+import re
+import sys
+
+from bench.seed import app, db, Transaction, Order, LedgerHead, seed_ledger, auth_header
+from sqlalchemy import event
+
+HOT_TABLES = {'transaction', 'orders', 'transaction_archive', 'orders_archive'}
+
+
+def explain(statement, parameters):
+    """Return a list of (table, problem) for one statement's plan, problem being None when fine."""
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == 'sqlite':
+            plan = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+            details = [row[3] for row in plan]
+            result = []
+            for detail in details:
+                match = re.match(r'(?:SCAN|SEARCH) (\w+)', detail)
+                if not match:
+                    continue
+                table = match.group(1)
+                problem = 'full scan' if detail.startswith('SCAN') and 'INDEX' not in detail else None
+                result.append((table, problem, detail))
+            if any('TEMP B-TREE FOR ORDER BY' in d for d in details):
+                result = [(t, p or 'filesort', d) for t, p, d in result]
+            return result
+        plan = conn.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings().all()
+        result = []
+        for row in plan:
+            problem = 'full scan' if row['type'] == 'ALL' else 'filesort' if 'filesort' in (row['Extra'] or '') else None
+            result.append((row['table'], problem, f"type={row['type']} key={row['key']} {row['Extra'] or ''}"))
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--customers', type=int, default=500)
+    args = parser.parse_args()
+
+    with app.app_context():
+        customers = seed_ledger(args.customers, args.rows)
+        admin = auth_header('admin', 'A')
+        manager = auth_header('manager', 'M')
+        settled = db.session.execute(
+            db.select(LedgerHead.username)
+            .join(Transaction, Transaction.transaction_id == LedgerHead.head_transaction_id)
+            .where(Transaction.status == 'VERIFIED')).scalars().all()
+        customer = auth_header(customers[0], 'U')
+        order_id = db.session.execute(db.select(Order.order_id).limit(1)).scalar()
+
+        captured = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, parameters, context, executemany:
+                     captured.append((statement, parameters)) if statement.lstrip().upper().startswith('SELECT') else None)
+
+        client = app.test_client()
+        first_page = {}
+        calls = [
+            ('GET /gettransactions (A/M)',
+             lambda: first_page.update(client.get('/gettransactions?limit=50', headers=manager).get_json())),
+            ('GET /gettransactions (A/M, next page)',
+             lambda: client.get('/gettransactions?limit=50&after=' + first_page['next'], headers=manager)),
+            ('GET /gettransactions (U)', lambda: client.get('/gettransactions', headers=customer)),
+            ('GET /getorders (A/M)', lambda: client.get('/getorders?limit=50', headers=manager)),
+            ('GET /getorders (U)', lambda: client.get('/getorders', headers=customer)),
+            ('GET /gettransactions?since (A/M)', lambda: client.get('/gettransactions?since=0&limit=50', headers=manager)),
+            ('GET /getorders?since (U)', lambda: client.get('/getorders?since=0', headers=customer)),
+            ('GET /reports/balances (A/M)', lambda: client.get('/reports/balances', headers=manager)),
+            ('GET /reports/orders/daily (A/M)', lambda: client.get('/reports/orders/daily?by=day_customer', headers=manager)),
+            ('GET /reports/pending (U)', lambda: client.get('/reports/pending', headers=customer)),
+            ('GET /export/transactions (A/M)', lambda: client.get('/export/transactions?from=2000-01-01',
+                                                                  headers=manager).get_data()),
+            ('GET /export/orders (U)', lambda: client.get('/export/orders?format=ndjson', headers=customer).get_data()),
+            ('POST /initiatetransaction', lambda: client.post('/initiatetransaction', headers=manager, json={
+                'transaction_id': 'plan-t', 'payment_method': 'cash', 'amount': 100, 'initiated_for': settled[0]})),
+            ('POST /initiateorder', lambda: client.post('/initiateorder', headers=manager, json={
+                'transaction_id': 'plan-o', 'payment_method': 'cash', 'no_bags': 10, 'rate': 300,
+                'initiated_for': settled[1], 'comments': 'plan'})),
+            ('POST /modifytransaction', lambda: client.post('/modifytransaction', headers=admin, json={
+                'transaction_id': 'plan-t', 'status': 'VERIFIED'})),
+            ('POST /modifytransaction_delete', lambda: client.post('/modifytransaction_delete', headers=admin, json={
+                'transaction_id': 'plan-t'})),
+            ('POST /modifyorder', lambda: client.post('/modifyorder', headers=admin, json={
+                'order_id': order_id, 'status': 'VERIFIED'})),
+            ('POST /modifyorder_delete', lambda: client.post('/modifyorder_delete', headers=admin, json={
+                'order_id': order_id})),
+        ]
+
+        failures = 0
+        for name, call in calls:
+            del captured[:]
+            call()
+            print(name)
+            for statement, parameters in list(captured):
+                for table, problem, detail in explain(statement, parameters):
+                    if table not in HOT_TABLES:
+                        continue
+                    failures += bool(problem)
+                    print(f"  {'FAIL ' + problem if problem else 'ok':<16} {table:<12} {detail}")
+
+    print(f'{failures} problem(s) found')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
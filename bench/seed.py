@@ -0,0 +1,85 @@
+"""Synthetic ledger shared by the benchmark scripts.
+
+Importing this module points the app at DATABASE_URL, defaulting to a
+throwaway SQLite file, so it must be imported before `app`.
+"""
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'i2step_bench.db'))
+
+from app import app, db, User, Transaction, Order, LedgerHead, compute_ledger_heads  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+CHUNK_SIZE = 10000
+
+
+def insert_chunked(model, rows):
+    for i in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(db.insert(model), rows[i:i + CHUNK_SIZE])
+
+
+def seed_ledger(customers=200, rows=100000, seed=0):
+    """Recreate the schema and fill it with `rows` transactions spread over `customers` users.
+
+    Every customer gets a consistent chain: roughly half the rows are orders
+    (with their positive transaction), the rest payments, about 5% of them
+    deactivated, and a third of the customers end with a pending transaction.
+    Returns the list of customer usernames.
+    """
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+
+    usernames = [f'c{i:05d}' for i in range(customers)]
+    users = [{'username': 'admin', 'password': 'password', 'role': 'A', 'name': 'Admin', 'phone_no': 1},
+             {'username': 'manager', 'password': 'password', 'role': 'M', 'name': 'Manager', 'phone_no': 2}]
+    users += [{'username': u, 'password': 'password', 'role': 'U', 'name': u, 'phone_no': 3} for u in usernames]
+    insert_chunked(User, users)
+
+    start = datetime.now() - timedelta(days=365)
+    step = timedelta(days=365) / rows
+    totals = dict.fromkeys(usernames, 0)
+    last = {}
+    transactions, orders = [], []
+    for i in range(rows):
+        username = rng.choice(usernames)
+        row_id = f't{i:08d}'
+        initiated_date = start + step * i
+        if rng.random() < 0.5:
+            no_bags, rate = rng.randint(1, 400), rng.choice([310.0, 325.5, 340.0])
+            amount = no_bags * rate
+            orders.append({'order_id': row_id, 'no_bags': no_bags, 'rate': rate, 'vehicle_no': f'MH{i % 97:02d}',
+                           'status': 'VERIFIED', 'initiated_date': initiated_date, 'verified_date': initiated_date,
+                           'initiated_by_id': 'manager', 'verified_by_id': username, 'initiated_for': username,
+                           'record_status': 1, 'comments': 'bench'})
+        else:
+            amount = -float(rng.randint(100, 50000))
+        record_status = 0 if rng.random() < 0.05 else 1
+        if record_status:
+            totals[username] += amount
+        transactions.append({'transaction_id': row_id, 'payment_method': 'cash', 'amount': amount,
+                             'status': 'VERIFIED', 'initiated_date': initiated_date, 'verified_date': initiated_date,
+                             'initiated_by_id': 'manager', 'verified_by_id': username, 'initiated_for': username,
+                             'record_status': record_status, 'total_amount': totals[username], 'comments': 'bench'})
+        last[username] = transactions[-1]
+
+    for username, row in last.items():
+        if rng.random() < 0.33:
+            if row['record_status']:
+                totals[username] -= row['amount']
+            row.update(status='INITIATED', verified_date=None, verified_by_id=None, total_amount=None)
+
+    insert_chunked(Transaction, transactions)
+    insert_chunked(Order, orders)
+    insert_chunked(LedgerHead, [{'username': username, **state} for username, state in compute_ledger_heads().items()])
+    db.session.commit()
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(db.text('ANALYZE'))
+    return usernames
+
+
+def auth_header(username, role):
+    return {'Authorization': 'Bearer ' + create_access_token(identity={'username': username, 'role': role})}
@@ -0,0 +1,36 @@
+"""Production serving profile: `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+Every worker is a separate process with its own DB connection pool and its
+own in-process caches, `/events` broker and metrics. Each request, including
+a long-lived `/events` or `/export` stream, holds one of the worker's
+GUNICORN_THREADS threads until it ends, so the app caps streams per process
+(EVENTS_MAX_SUBSCRIBERS, EXPORT_MAX_STREAMS; a quarter of the threads each
+by default) and answers 503 past that. Raise GUNICORN_THREADS, not the caps,
+to hold more streams. Size DB_POOL_SIZE to GUNICORN_THREADS so no thread
+waits for a connection.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+# The app sizes its password hash pool from these (see app.py), so hand the defaults down to the workers
+os.environ.setdefault('WEB_CONCURRENCY', str(workers))
+os.environ.setdefault('GUNICORN_THREADS', str(threads))
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound slow leaks; the jitter keeps them from restarting together
+max_requests = 10000
+max_requests_jitter = 1000
+
+# The app starts background threads (log writer, password hash pool) at import,
+# which would not survive the fork, so each worker imports it itself
+preload_app = False
+
+# Request logs are written by the app as JSON lines on stderr
+accesslog = None
+errorlog = '-'
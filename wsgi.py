@@ -0,0 +1,8 @@
+"""WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Create or migrate the schema with `flask --app app upgrade-db` first; unlike
+`python app.py` this does not touch the database on startup.
+"""
+from app import app  # noqa: F401